@@ -1,6 +1,10 @@
-from d3 import mcd
+from d3 import mcd, codes
 from d3.mcd import State #, add other usefull import here
+from d3.codes import REPR_TO_TERNARY
 from d3.method_decorator import method
+from d3.tiling import TiledMatrix
+from d3.sweep import Sweep
+from d3.stats import CellStats
 import B1530Lib
 import lab.keith2230GDriver as kdriver
 
@@ -39,6 +43,12 @@ class Design3Driver:
 
 		_last_wgfu_config: int
 			Stores the last operation performed, not to reconfigure everything if it is the same (see 'WGFMU Configuration Constants')
+
+		_resident_weights: np.ndarray
+			The 8x8 ternary matrix last written with 'fill', None if unknown (see 'program_weights')
+
+		_resident_write_count: int
+			The value of '_mcd.write_count' right after '_resident_weights' was written, any later write invalidates it
 	
 		k2230g_chans: dict(str, str)
 			Associates voltage sources (VDD, VDDC, VDDR) to power supply channel (CH1..3)
@@ -49,7 +59,7 @@ class Design3Driver:
 
 	K2230G_DEFAULT_ADDR = "GPIB::6::INSTR"
 
-	def __init__(self, uc_pid = mcd.MCDriver.DEFAULT_PID, b1530_addr = B1530Lib.B1530.DEFAULT_ADDR, k2230g_addr = K2230G_DEFAULT_ADDR):
+	def __init__(self, uc_pid = mcd.MCDriver.DEFAULT_PID, b1530_addr = B1530Lib.B1530.DEFAULT_ADDR, k2230g_addr = K2230G_DEFAULT_ADDR, uc_url = None):
 		"""
 		Creates the driver.
 
@@ -64,14 +74,18 @@ class Design3Driver:
 			pid: optional, the pid to search for.
 			b1530_addr: optionnal, the visa addr to search for the B1530. If None, do not use the B1530
 			k2230g_addr: optionnal, the visa addr to search for the Keithley 2230G. If None, do not use K2230G
+			uc_url: optionnal, a pyserial URL to reach the µc instead of its PID, e.g. a simulated µc (see 'd3.sim')
 		"""
 		self._mcd     = None
 		self._b1530   = None
 		self._kdriver = None
 
-		if uc_pid is not None:
+		self._resident_weights     = None
+		self._resident_write_count = None
+
+		if uc_pid is not None or uc_url is not None:
 			try:
-				self._mcd = mcd.MCDriver(uc_pid)
+				self._mcd = mcd.MCDriver(uc_pid, url=uc_url)
 			except Exception as e:
 				del self
 				raise e
@@ -152,6 +166,7 @@ class Design3Driver:
 			self.set_voltages({'VDD': 0.0, 'VDDR': 0.0, 'VDDC': 0.0})
 		
 		self._last_wgfu_config = -1 # Initially, no WGFMU Configuration
+		self._resident_weights = None # The array content is not trusted anymore
 		self.discharge_time = None
 		self.precharge_time = None
 		self.interval       = 20e-6
@@ -304,11 +319,7 @@ class Design3Driver:
 	##### HIGH-LEVEL ARRAY MANIPULATION METHODS #####
 	@staticmethod
 	def ternary_to_repr(t: int):
-		return {
-			 1: 0b10, # HRS-LRS
-			 0: 0b00, # HRS-HRS
-			-1: 0b01, # LRS-HRS
-		}[t]
+		return codes.TERNARY_TO_REPR[t]
 
 	@staticmethod
 	def concat(arr: List[List[int]], m = lambda x: x) -> List[int]:
@@ -343,6 +354,8 @@ class Design3Driver:
 			VDDC: float, self.voltages['SET']['VDDC'] by default
 			VDDR: float, self.voltages['SET']['VDDR'] by default
 		"""
+		self._resident_weights = None # Array content is no longer a known ternary matrix
+
 		if self._kdriver is not None:
 			self.set_voltages_or_default('SET', VDD, VDDC, VDDR)
 		
@@ -369,6 +382,8 @@ class Design3Driver:
 			VDDC: float, self.voltages['SET']['VDDC'] by default
 			VDDR: float, self.voltages['SET']['VDDR'] by default
 		"""
+		self._resident_weights = None # Array content is no longer a known ternary matrix
+
 		if self._kdriver is not None:
 			self.set_voltages_or_default('RESET', VDD, VDDC, VDDR)
 		
@@ -395,6 +410,8 @@ class Design3Driver:
 			VDDC: float, self.voltages['SET']['VDDC'] by default
 			VDDR: float, self.voltages['SET']['VDDR'] by default
 		"""
+		self._resident_weights = None # Array content is no longer a known ternary matrix
+
 		if self._kdriver is not None:
 			self.set_voltages_or_default('FORM')
 
@@ -450,6 +467,9 @@ class Design3Driver:
 			self.set(set_values)
 			self.reset(reset_values)
 
+		self._resident_weights     = np.array(values, dtype=int)
+		self._resident_write_count = self._mcd.write_count
+
 	def sense(self, measure_pulses=False, sense_uc=False, VDD:float = None, VDDC:float = None, VDDR:float = None):
 		"""
 		Reads out the array
@@ -485,4 +505,113 @@ class Design3Driver:
 		values = np.array([b for b in values], dtype=int) # Convert array of bytes into array of integers
 		values = values.reshape(8, 8)                     # Shape 1D array of size 64 to 8x8 2D array
 		
-		return values
\ No newline at end of file
+		return values
+
+	##### IN-MEMORY COMPUTE METHODS #####
+	@staticmethod
+	def repr_to_ternary(values) -> np.ndarray:
+		"""
+		Decodes sensed values back to ternary weights, inverse of 'ternary_to_repr'.
+
+		Parameters:
+			values: array of '0bXY' integers, as returned by 'sense'
+			Details:
+				'0b11' should not happen and is decoded as 0
+
+		Returns:
+			np.ndarray of '1', '-1' or '0', with the same shape as values
+		"""
+		return REPR_TO_TERNARY[np.asarray(values, dtype=int)]
+
+	@staticmethod
+	def vmm_reference(weights, inputs) -> np.ndarray:
+		"""
+		Pure NumPy vector-matrix multiply, used as a reference for 'vmm'.
+
+		Parameters:
+			weights: 2D array of '1', '-1' or '0', rows are the inputs, columns the outputs
+			inputs: 1D input vector or 2D batch of input vectors (one per row)
+
+		Returns:
+			np.ndarray : inputs @ weights, a vector or a batch of output vectors (one per row)
+		"""
+		return np.asarray(inputs) @ np.asarray(weights, dtype=int)
+
+	def is_resident(self, weights) -> bool:
+		"""
+		Returns True if the 8x8 ternary matrix provided is the one last written with 'fill'.
+
+		Details:
+			Any write made since then, including directly through '_mcd.set'/'_mcd.reset', makes it non-resident.
+		"""
+		return self._resident_weights is not None \
+			and self._resident_write_count == self._mcd.write_count \
+			and np.array_equal(self._resident_weights, weights)
+
+	def program_weights(self, weights, otp=False):
+		"""
+		Programs a ternary weight matrix into the array, unless it is already resident.
+
+		Parameters:
+			weights: List[List[int]] or np.ndarray : 8x8 array of '1', '-1' or '0' (see 'fill')
+			otp: bool : See 'fill' [False by default]
+
+		Returns:
+			bool : True if the array has been written, False if the weights were already resident
+		"""
+		weights = np.asarray(weights, dtype=int)
+		if weights.shape != (8, 8):
+			raise ValueError(f"Expected 8x8 array, got shape {weights.shape}")
+		if not np.isin(weights, (-1, 0, 1)).all():
+			raise ValueError("Expected ternary weights ('1', '-1' or '0')")
+
+		if self.is_resident(weights):
+			return False
+
+		self.fill(weights.tolist(), otp)
+		return True
+
+	def vmm(self, inputs, weights=None, otp=False, sense_every=1, measure_pulses=False, sense_uc=False, VDD:float = None, VDDC:float = None, VDDR:float = None):
+		"""
+		Evaluates a batch of vector-matrix multiplies with the weights stored in the array
+
+		Parameters:
+			inputs: 1D input vector of size 8 or 2D batch of input vectors (one per row)
+			weights: 8x8 ternary matrix to program first (see 'program_weights'), or None to use the resident one [None by default]
+			otp: bool : See 'fill', used when 'weights' is provided [False by default]
+			sense_every: int : Number of input vectors evaluated per array readout, or None for a single readout per batch [1 by default]
+			measure_pulses, sense_uc, VDD, VDDC, VDDR: See 'sense'
+
+		Returns:
+			np.ndarray : The output vector, or the batch of output vectors (one per row)
+			Details:
+				out[n, col] = sum(inputs[n, row] * weights[row, col] for row in range(8)), see 'vmm_reference'
+
+		Details:
+			The weights are programmed once, then the array is read out through whichever sense path is used by 'sense'
+			(B1530 or µc) and the sensed weights are applied to the input vectors.
+			The array is read out ceil(len(inputs) / sense_every) times: by default once per input vector,
+			so that a vectors-per-second benchmark measures the array and not only the NumPy product.
+		"""
+		if weights is not None:
+			self.program_weights(weights, otp)
+		elif self._resident_weights is None or self._resident_write_count != self._mcd.write_count:
+			raise ValueError("No weights resident in the array, provide 'weights' or call 'program_weights' first")
+
+		inputs = np.asarray(inputs)
+		single = (inputs.ndim == 1)
+		inputs = np.atleast_2d(inputs)
+		if inputs.ndim != 2 or inputs.shape[1] != 8:
+			raise ValueError(f"Expected input vectors of size 8, got shape {inputs.shape}")
+
+		if sense_every is None:
+			sense_every = max(len(inputs), 1)
+		elif sense_every < 1:
+			raise ValueError(f"Expected sense_every >= 1, got {sense_every}")
+
+		outputs = np.empty((len(inputs), 8), dtype=np.result_type(inputs, int))
+		for start in range(0, len(inputs), sense_every):
+			sensed = self.repr_to_ternary(self.sense(measure_pulses, sense_uc, VDD, VDDC, VDDR))
+			outputs[start:start + sense_every] = self.vmm_reference(sensed, inputs[start:start + sense_every])
+
+		return outputs[0] if single else outputs
@@ -0,0 +1,320 @@
+import numpy as np
+
+import math, queue, socket, socketserver, struct, threading
+from typing import List
+
+##########################
+# Bench protocol constants
+# Every message is a HEADER (op or status, payload length) followed by its payload, little-endian
+HEADER = struct.Struct('<BI')
+
+# Request ops
+OP_FILL         = 1 # FILL_REQ         -> STATUS_OK
+OP_SENSE        = 2 # SENSE_REQ        -> 'count' x STATUS_FRAME, STATUS_OK
+OP_SET_VOLTAGES = 3 # SET_VOLTAGES_REQ -> STATUS_OK
+
+FILL_REQ         = struct.Struct('<64bB')  # ternary values (row-major), otp
+SENSE_REQ        = struct.Struct('<BIddd') # sense_uc, count, VDD, VDDC, VDDR (NaN for default)
+SET_VOLTAGES_REQ = struct.Struct('<ddd')   # VDD, VDDC, VDDR (NaN to leave unchanged)
+
+# Response status
+STATUS_OK    = 0
+STATUS_FRAME = 1 # Payload: the 64 uint8 values sensed (row-major)
+STATUS_ERROR = 2 # Payload: the utf-8 error message
+
+DEFAULT_PORT = 7701
+
+#################
+# Utils function
+#################
+def _recv_exact(sock, size: int) -> bytes:
+	out = b''
+	while len(out) < size:
+		chunk = sock.recv(size - len(out))
+		if len(chunk) == 0:
+			raise ConnectionError("Connection closed by the peer")
+		out += chunk
+	return out
+
+def _recv_message(sock):
+	code, size = HEADER.unpack(_recv_exact(sock, HEADER.size))
+	return code, _recv_exact(sock, size)
+
+def _message(code: int, payload: bytes = b'') -> bytes:
+	return HEADER.pack(code, len(payload)) + payload
+
+def _or_nan(v: float) -> float:
+	return math.nan if v is None else v
+
+def _or_none(v: float) -> float:
+	return None if math.isnan(v) else v
+
+###################
+# class BenchServer
+###################
+class BenchServer:
+	"""
+		Bench daemon sharing a single Design3Driver between several local clients (see 'BenchClient')
+
+		...
+		Attributes
+		----------
+		driver: Design3Driver
+			The driver owned by the server, only used by the worker thread
+
+		address: (str, int)
+			The address the server listens on
+
+		stats: dict(str, int)
+			'requests' executed and 'merged' sense requests run right after another one with the same voltage profile
+	"""
+
+	def __init__(self, driver, host = 'localhost', port = DEFAULT_PORT):
+		"""
+		Parameters:
+			driver: Design3Driver : The driver to share
+			host: str : The address to listen on ['localhost' by default]
+			port: int : The port to listen on, 0 for any free port [DEFAULT_PORT by default]
+		"""
+		self.driver = driver
+		self.stats  = {'requests': 0, 'merged': 0}
+
+		self._queue = queue.Queue()
+
+		server = self
+		class Handler(socketserver.BaseRequestHandler):
+			def handle(self):
+				server._handle(self.request)
+
+		self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+		self._server.daemon_threads = True
+		self.address = self._server.server_address[:2]
+
+		self._threads = []
+
+	def start(self):
+		"""Serves in background threads, returns self."""
+		self._threads = [
+			threading.Thread(target=self._work, daemon=True),
+			threading.Thread(target=self._server.serve_forever, daemon=True),
+		]
+		for t in self._threads:
+			t.start()
+		return self
+
+	def serve_forever(self):
+		"""Serves until interrupted."""
+		self.start()
+		try:
+			self._threads[0].join()
+		finally:
+			self.shutdown()
+
+	def shutdown(self):
+		"""Stops serving, the requests already queued are executed first."""
+		self._server.shutdown()
+		self._server.server_close()
+		self._queue.put(None)
+
+	##### CONNECTION HANDLING #####
+	def _handle(self, sock):
+		replies = queue.Queue()
+		while True:
+			try:
+				op, payload = _recv_message(sock)
+			except ConnectionError:
+				return
+
+			try:
+				request = self._decode(op, payload)
+			except (ValueError, struct.error) as e:
+				try:
+					sock.sendall(_message(STATUS_ERROR, str(e).encode()))
+				except ConnectionError:
+					return
+				continue
+
+			cancelled = threading.Event() # Set if the client leaves, not to run the rest of its request for nobody
+			self._queue.put((op, request, replies, cancelled))
+			try:
+				while True:
+					status, payload = replies.get()
+					sock.sendall(_message(status, payload))
+					if status != STATUS_FRAME:
+						break
+			except ConnectionError:
+				cancelled.set()
+				return
+
+	@staticmethod
+	def _decode(op: int, payload: bytes):
+		if op == OP_FILL:
+			*values, otp = FILL_REQ.unpack(payload)
+			return np.array(values, dtype=int).reshape(8, 8).tolist(), bool(otp)
+		if op == OP_SENSE:
+			sense_uc, count, *voltages = SENSE_REQ.unpack(payload)
+			return bool(sense_uc), count, tuple(_or_none(v) for v in voltages)
+		if op == OP_SET_VOLTAGES:
+			return tuple(_or_none(v) for v in SET_VOLTAGES_REQ.unpack(payload))
+		raise ValueError(f"Unknown op '{op}'")
+
+	##### WORKER #####
+	def _work(self):
+		while True:
+			batch = [self._queue.get()]
+			while True: # Drains everything queued meanwhile, to be merged
+				try:
+					batch.append(self._queue.get_nowait())
+				except queue.Empty:
+					break
+
+			stop = None in batch
+			for group in self._schedule([item for item in batch if item is not None]):
+				for i, (op, request, replies, cancelled) in enumerate(group):
+					self._execute(op, request, replies, cancelled)
+					self.stats['requests'] += 1
+					self.stats['merged']   += (i != 0)
+
+			if stop:
+				return
+
+	@staticmethod
+	def _schedule(batch) -> List[List]:
+		"""
+		Groups the queued sense requests having the same voltage profile, without moving them across fill or set_voltages requests.
+
+		Returns:
+			The groups of requests, in execution order
+		"""
+		plan = []
+		senses = dict()
+		for item in batch:
+			op, request, _, _ = item
+			if op == OP_SENSE:
+				sense_uc, _, voltages = request
+				senses.setdefault((sense_uc, voltages), []).append(item)
+			else:
+				plan.extend(senses.values())
+				senses = dict()
+				plan.append([item])
+
+		plan.extend(senses.values())
+		return plan
+
+	def _execute(self, op, request, replies, cancelled):
+		if cancelled.is_set():
+			return
+
+		try:
+			if op == OP_FILL:
+				values, otp = request
+				self.driver.fill(values, otp)
+
+			elif op == OP_SENSE:
+				sense_uc, count, (VDD, VDDC, VDDR) = request
+				for _ in range(count):
+					if cancelled.is_set():
+						return
+					values = self.driver.sense(sense_uc=sense_uc, VDD=VDD, VDDC=VDDC, VDDR=VDDR)
+					replies.put((STATUS_FRAME, np.asarray(values, dtype=np.uint8).tobytes()))
+
+			elif op == OP_SET_VOLTAGES:
+				if self.driver._kdriver is None:
+					raise ValueError("No power supply used by the driver")
+				voltages = dict(zip(('VDD', 'VDDC', 'VDDR'), request))
+				self.driver.set_voltages({ rail: v for rail, v in voltages.items() if v is not None })
+
+		except Exception as e:
+			replies.put((STATUS_ERROR, f"{type(e).__name__}: {e}".encode()))
+			return
+
+		replies.put((STATUS_OK, b''))
+
+###################
+# class BenchClient
+###################
+class BenchClient:
+	"""
+		Client of a BenchServer, mirroring the Design3Driver methods it exposes
+	"""
+
+	def __init__(self, host = 'localhost', port = DEFAULT_PORT):
+		self._sock = socket.create_connection((host, port))
+		self._stream = None # Token of the request whose replies are still being received
+
+	def __del__(self):
+		self.close()
+
+	def close(self):
+		"""Closes the connection."""
+		if self._sock is not None:
+			self._sock.close()
+			self._sock = None
+
+	def _drain(self):
+		# Skips the replies left by a stream the caller stopped iterating, up to its final one
+		while self._stream is not None:
+			status, _ = _recv_message(self._sock)
+			if status != STATUS_FRAME:
+				self._stream = None
+
+	def _request(self, op: int, payload: bytes):
+		self._drain()
+		self._sock.sendall(_message(op, payload))
+
+		token = self._stream = object()
+		while True:
+			status, payload = _recv_message(self._sock)
+			if status != STATUS_FRAME:
+				self._stream = None
+				if status == STATUS_ERROR:
+					raise RuntimeError(f"Bench server error: {payload.decode()}")
+				return
+			yield payload
+			if self._stream is not token: # Drained by a later request meanwhile
+				return
+
+	def fill(self, values, otp=False):
+		"""See 'Design3Driver.fill'."""
+		values = np.asarray(values, dtype=int)
+		if values.shape != (8, 8):
+			raise ValueError("Expected 8x8 array")
+		for _ in self._request(OP_FILL, FILL_REQ.pack(*values.ravel().tolist(), otp)):
+			pass
+
+	def iter_sense(self, count=1, sense_uc=False, VDD:float = None, VDDC:float = None, VDDR:float = None):
+		"""
+		Reads out the array 'count' times, yielding the 8x8 uint8 arrays as they are streamed back (see 'Design3Driver.sense').
+
+		Details:
+			If the iteration is stopped early, the remaining frames are still sensed and skipped by the next request.
+		"""
+		payload = SENSE_REQ.pack(sense_uc, count, _or_nan(VDD), _or_nan(VDDC), _or_nan(VDDR))
+		for frame in self._request(OP_SENSE, payload):
+			yield np.frombuffer(frame, dtype=np.uint8).reshape(8, 8)
+
+	def sense(self, sense_uc=False, VDD:float = None, VDDC:float = None, VDDR:float = None):
+		"""See 'Design3Driver.sense'."""
+		return self.burst(1, sense_uc, VDD, VDDC, VDDR)[0]
+
+	def burst(self, count, sense_uc=False, VDD:float = None, VDDC:float = None, VDDR:float = None):
+		"""
+		Reads out the array 'count' times.
+
+		Returns:
+			np.ndarray : The values sensed, of shape (count, 8, 8) and dtype uint8
+		"""
+		frames = list(self.iter_sense(count, sense_uc, VDD, VDDC, VDDR))
+		return np.array(frames, dtype=np.uint8).reshape(count, 8, 8)
+
+	def set_voltages(self, VDD:float = None, VDDC:float = None, VDDR:float = None):
+		"""See 'Design3Driver.set_voltages', None leaves the rail unchanged."""
+		for _ in self._request(OP_SET_VOLTAGES, SET_VOLTAGES_REQ.pack(_or_nan(VDD), _or_nan(VDDC), _or_nan(VDDR))):
+			pass
+
+if __name__ == '__main__':
+	from d3 import Design3Driver
+
+	server = BenchServer(Design3Driver())
+	print(f"Bench server listening on {server.address[0]}:{server.address[1]}")
+	server.serve_forever()
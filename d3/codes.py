@@ -0,0 +1,19 @@
+import numpy as np
+
+#######################
+# Sensed value encoding
+#######################
+# '0bXY' value read out for each ternary value: X is set if Rb is in LRS, Y if R is in LRS
+TERNARY_TO_REPR = {
+	 1: 0b10, # HRS-LRS
+	 0: 0b00, # HRS-HRS
+	-1: 0b01, # LRS-HRS
+}
+
+INVALID_REPR = 0b11 # LRS-LRS, should not happen
+
+# Lookup tables of TERNARY_TO_REPR and its inverse, to encode and decode NumPy arrays
+TERNARY_TO_REPR_TABLE = np.array([TERNARY_TO_REPR[t] for t in (-1, 0, 1)], dtype=np.uint8) # Indexed by ternary + 1
+
+_repr_to_ternary = { r: t for t, r in TERNARY_TO_REPR.items() }
+REPR_TO_TERNARY = np.array([_repr_to_ternary.get(r, 0) for r in range(4)]) # Indexed by '0bXY', INVALID_REPR is decoded as 0
@@ -67,6 +67,16 @@ class CMD(IntEnum):
 CMD_LIST = list(CMD.__members__.values())
 CMD_COUNT = len(CMD_LIST)
 
+# Commands which can be sent again without side effects if their ack or return value has been lost
+# (SET/RESET pulse the memristors again, CLK/CLK2 shift the registers, SENSE is clocked by the B1530)
+IDEMPOTENT_CMDS = [CMD.WRITE_CS, CMD.SET_ADR, CMD.SENSE_UC, CMD.ACK_MODE, CMD.DEBUG_ECHO, CMD.DEBUG_LED]
+
+# Size of the value returned by the commands which return a fixed number of bytes
+RETURN_SIZES = {
+	CMD.SENSE:    64, # One '0bXY' value per cell
+	CMD.SENSE_UC: 64,
+}
+
 ### END C enums and flags ###
 
 #################
@@ -78,6 +88,21 @@ def as_int(b: bytes) -> int:
 def as_bytes(i: int) -> bytes:
 	return i.to_bytes(max((i.bit_length() + 7) // 8, 1), 'little')
 
+def as_arg_bytes(arg) -> bytes:
+	"""Converts a command argument to the bytes sent."""
+	if isinstance(arg, int):
+		return as_bytes(arg)
+	elif isinstance(arg, List):
+		raise ValueError("Please unpack lists in argument: '*[...]'")
+	return bytes(arg)
+
+############
+# Exceptions
+############
+class LinkError(Exception):
+	"""Raised when the serial link with the µc is desynchronized (missing, misframed or mismatching ack)."""
+	pass
+
 ##############
 # Driver class
 ##############
@@ -92,9 +117,21 @@ class MCDriver:
 
 	uc_ack_mode : ACK
 		stores the actual ack_mode of the µc
+
+	max_retries : int
+		number of times an idempotent command is sent again after a resync (see 'IDEMPOTENT_CMDS')
+
+	link_stats : dict(str, int)
+		link health counters: 'retries' (commands sent again), 'resyncs' (see 'resync') and 'stale_bytes' (unexpected bytes flushed)
+
+	write_count : int
+		number of SET/RESET commands sent, to detect writes to the array made behind the back of a higher-level driver
 	
 	"""
 	DEFAULT_PID = 22336
+	DEFAULT_TIMEOUT = 1.0 # s, time to wait for an ack before considering it lost
+
+	RESYNC_PROBE = b'\x5A\xA5' # Echoed back by the µc with 'DEBUG_ECHO', does not contain the '0xAA'/'0xAB' framing bytes
 
 	def __new__(cls, *args, **kwargs):
 		self = super().__new__(cls)  
@@ -107,7 +144,7 @@ class MCDriver:
 
 		return self
 
-	def __init__(self, pid = DEFAULT_PID):
+	def __init__(self, pid = DEFAULT_PID, url = None):
 		"""
 		Creates the driver.
 
@@ -118,11 +155,26 @@ class MCDriver:
 
 		Arguments:
 			pid: optional, the pid to search for.
+			url: optional, a pyserial URL to open instead of searching for the PID, e.g. 'socket://localhost:7700' (see 'd3.sim')
 		"""
-		self.ser = serial.Serial()
+		self.ser = serial.Serial() if url is None else serial.serial_for_url(url, do_not_open=True)
 		self.ser.baudrate = 921600
+		self.ser.timeout = MCDriver.DEFAULT_TIMEOUT
 		self.uc_ack_mode = ACK.NONE
 
+		self.write_count = 0
+
+		self.max_retries = 2
+		self.link_stats = {
+			'retries':     0,
+			'resyncs':     0,
+			'stale_bytes': 0,
+		}
+
+		if url is not None:
+			self.ser.open()
+			return
+
 		ports = serial.tools.list_ports.comports()
 		st_port = None
 
@@ -170,10 +222,14 @@ class MCDriver:
 
 		Details:
 			The µc cannot receive more than 64 bytes in one shot, this function will split the arguments and send them by packets of 64 bytes max
+			Bytes left in the input buffer before sending are stale, they are flushed and counted in 'link_stats'.
+			RAISE LinkError if the ack is expected and is missing, misframed or does not match the command.
 		"""
 		if not self.ser.is_open:
 			raise Exception("Serial port not open")
 
+		self.link_stats['stale_bytes'] += self.flush_input()
+
 		if command == CMD.ACK_MODE:
 			self.uc_ack_mode = args[0]
 	
@@ -199,12 +255,7 @@ class MCDriver:
 			cmd = b'\xAA' + command_bytes if i == 0 else b''
 			
 			for arg in args:
-				if isinstance(arg, int):
-					cmd += as_bytes(arg)
-				elif isinstance(arg, List):
-					raise ValueError("Please unpack lists in argument: '*[...]'")
-				else:
-					cmd += bytes(arg)
+				cmd += as_arg_bytes(arg)
 
 			cmd += b'\xAA' if i + 1 == len(split_args) else b'\xAB'
 			
@@ -212,8 +263,12 @@ class MCDriver:
 
 		if wait_for_ack:
 			ack = self.read(2, flush_rest=False)
+			if len(ack) < 2:
+				raise LinkError(f"Timed out waiting for ack of command '{command}', got '{ack}'")
+			if ack[0] != 0xAA:
+				raise LinkError(f"Framing lost waiting for ack of command '{command}', got '{ack}'")
 			if ack != b'\xAA' + command_bytes:
-				raise Exception(f"Expected ack for command '{command}', got '{ack}'")
+				raise LinkError(f"Expected ack for command '{command}', got '{ack}'")
 
 		return bytes_sent_count
 
@@ -223,7 +278,7 @@ class MCDriver:
 
 		Parameters:
 			size:       The number of bytes to read. If None, reads everything.
-			wait_for:   When size=None, if True, waits for input ; When size!=None, wait_for is True
+			wait_for:   When size=None, if True, waits for input up to the serial timeout ; When size!=None, wait_for is True
 			flush_rest: If True, flushes the input buffer if non-empty after {size} bytes have been read.
 		
 		Returns:
@@ -233,15 +288,12 @@ class MCDriver:
 			raise Exception("Serial port not open")
 
 		if size is None:
-			out = b''
-
-			# Block or not until something is in
-			while wait_for and not self.ser.in_waiting:
-				pass
+			# Block or not until something is in, ser.read returns b'' on timeout
+			out = self.ser.read(1) if wait_for else b''
 
 			# Read everything until the buffer is empty
 			while self.ser.in_waiting:
-				out += self.ser.read()
+				out += self.ser.read(self.ser.in_waiting)
 			return out
 		
 		# else
@@ -264,21 +316,94 @@ class MCDriver:
 		Details:
 			Will expect an ack if set with the corresponding 'action' command (driver.ack_mode(ACK.XXX)) (RAISE if expected and not received)
 			Will return the value received if the command is a 'get' command
+			Will RAISE LinkError if the value returned is short or malformed, for the commands in RETURN_SIZES
+			On a LinkError, resyncs the link (see 'resync') and sends the command again if it is idempotent, up to 'max_retries' times
 		"""
 
-		cmd_name = str(command)[4:] # str(command) == CMD.XXX => str(command)[4:] == XXX
-		wait_for_ack = (cmd_name in str(self.uc_ack_mode))
-		cmd_returns = (cmd_name not in str(ACK_ALL)) and command != CMD.ACK_MODE # If the commands does not have an associated ack, it is because it returns something
+		cmd_name = CMD(command).name # Not str(command), which is only 'CMD.XXX' before Python 3.11
+		cmd_ack = ACK.__members__.get(cmd_name, ACK.NONE)
+		wait_for_ack = bool(cmd_ack & self.uc_ack_mode)
+		cmd_returns = (cmd_ack == ACK.NONE) and command != CMD.ACK_MODE # If the commands does not have an associated ack, it is because it returns something
 
 		if command == CMD.ACK_MODE and args[0] != ACK.NONE:
 			wait_for_ack = True
 			cmd_returns = False
+
+		# DEBUG_ECHO sends back its arguments, the other returning commands have a fixed size or are read until the timeout
+		echo_size = sum(len(as_arg_bytes(arg)) for arg in args) if command == CMD.DEBUG_ECHO else None
+
+		if command in (CMD.SET, CMD.RESET):
+			self.write_count += 1
 		
-		self.send_command(command, *args, wait_for_ack=wait_for_ack)
+		for attempt in range(self.max_retries + 1):
+			try:
+				self.send_command(command, *args, wait_for_ack=wait_for_ack)
+				return self.read_return(command, echo_size) if cmd_returns else None
+			except LinkError as e:
+				self.resync()
+				if command not in IDEMPOTENT_CMDS or attempt == self.max_retries:
+					raise e
+				self.link_stats['retries'] += 1
+
+	def read_return(self, command, size=None):
+		"""
+		Reads the value returned by a command.
 
-		return self.read() if cmd_returns else None
+		Parameters:
+			command: The command sent (see CMD_LIST)
+			size: The number of bytes expected, for the commands not in RETURN_SIZES, or None if unknown [None by default]
+
+		Details:
+			For the commands in RETURN_SIZES, or when 'size' is provided, reads exactly that many bytes, bounded by the serial timeout.
+			RAISE LinkError if fewer bytes arrived, or if they are not '0bXY' values for the commands in RETURN_SIZES.
+			Otherwise, reads everything (see 'read') and RAISE LinkError if nothing arrived before the serial timeout.
+		"""
+		size = RETURN_SIZES.get(command, size)
+		if size is None:
+			out = self.read()
+			if len(out) == 0:
+				raise LinkError(f"Timed out waiting for the value returned by command '{command}'")
+			return out
+
+		out = self.read(size, flush_rest=False) # Bytes in excess are stale, flushed by the next command
+		if len(out) < size:
+			raise LinkError(f"Expected {size} bytes from command '{command}', got {len(out)}")
+		if command in RETURN_SIZES and any(b > 0b11 for b in out):
+			raise LinkError(f"Malformed value returned by command '{command}': '{out}'")
+		return out
+
+	def resync(self):
+		"""
+		Resynchronizes the link with the µc, after a LinkError for example.
+
+		Details:
+			Flushes the input buffer, probes the µc with 'DEBUG_ECHO' until 'RESYNC_PROBE' is echoed back,
+			then restores the ack mode.
+			RAISE LinkError if the µc does not answer the probe.
+		"""
+		self.link_stats['resyncs'] += 1
+		self.link_stats['stale_bytes'] += self.flush_input()
+
+		self.send_command(CMD.DEBUG_ECHO, *self.RESYNC_PROBE)
+
+		echo = b''
+		while self.RESYNC_PROBE not in echo:
+			b = self.ser.read(1) # Returns b'' on timeout
+			if len(b) == 0:
+				raise LinkError(f"µc did not answer the resync probe, got '{echo}'")
+			echo += b
+		self.link_stats['stale_bytes'] += len(echo) - len(self.RESYNC_PROBE) + self.flush_input()
+
+		self.send_command(CMD.ACK_MODE, self.uc_ack_mode, wait_for_ack=(self.uc_ack_mode != ACK.NONE))
 
 	def flush_input(self):
-		"""Flushes the input buffer."""
+		"""
+		Flushes the input buffer.
+
+		Returns:
+			The number of bytes flushed.
+		"""
+		count = 0
 		while self.ser.in_waiting:
-				self.ser.read()
\ No newline at end of file
+			count += len(self.ser.read(self.ser.in_waiting))
+		return count
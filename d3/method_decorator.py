@@ -1,33 +1,39 @@
-import types, functools, inspect
+import types, inspect
 
 def method(obj):
-  def copy_func(f):
-      return types.FunctionType(f.__code__, f.__globals__, f.__name__, f.__defaults__, f.__closure__)
-  def apply_self(fn, self, fullargspec=None):
-    fullargspec = fullargspec or inspect.getfullargspec(fn)[0]
-    if len(fullargspec) != 0 and fullargspec[0] == "self":
-      return functools.partial(fn, obj)
-    else:
-      return fn
-  
+  def copy_func(f, defaults, kwdefaults):
+    g = types.FunctionType(f.__code__, f.__globals__, f.__name__, defaults, f.__closure__)
+    g.__kwdefaults__   = kwdefaults
+    g.__doc__          = f.__doc__
+    g.__qualname__     = f.__qualname__
+    g.__annotations__  = f.__annotations__
+    g.__dict__.update(f.__dict__)
+    return g
+
+  def bind_parent(func, parent):
+    # 'parent' becomes a default value of the function: no extra call layer
+    spec = inspect.getfullargspec(func)
+    if "parent" in spec.kwonlyargs:
+      return copy_func(func, func.__defaults__, {**(func.__kwdefaults__ or {}), "parent": parent})
+    if spec.args[-1] == "parent":
+      defaults = func.__defaults__ or ()
+      if len(defaults) != 0: # 'parent' already has a default value, which is the last one
+        defaults = defaults[:-1]
+      return copy_func(func, defaults + (parent,), func.__kwdefaults__)
+    raise ValueError("The argument 'parent' of the method {} must be the last one".format(func.__name__))
+
   def decorator(func):
     name = func.__name__
-    fullargspec = inspect.getfullargspec(func)[0]
-    if "parent" in fullargspec:
+    fullargspec = inspect.getfullargspec(func)
+    if "parent" in fullargspec.args or "parent" in fullargspec.kwonlyargs:
       if hasattr(obj, name):
-        func_copy = copy_func(getattr(obj, name))
-        parent = apply_self(func_copy, obj)
+        func = bind_parent(func, getattr(obj, name)) # Resolved once, already bound to obj if it is a method
       else:
         raise ValueError("Unexpected argument 'parent' as the method {} does not have a default implementation".format(name))
-      
-      def wrapped_func(*args, **kwargs):
-        func(parent=parent, *args, **kwargs)
-      
-    else:
-      def wrapped_func(*args, **kwargs):
-        func(*args, **kwargs)
 
-    wrapped_func = apply_self(wrapped_func, obj, fullargspec)
-    setattr(obj, name, wrapped_func)
-    return wrapped_func
+    if len(fullargspec.args) != 0 and fullargspec.args[0] == "self":
+      func = func.__get__(obj, type(obj)) # Bound method, through the descriptor protocol
+
+    setattr(obj, name, func)
+    return func
   return decorator
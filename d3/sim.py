@@ -0,0 +1,148 @@
+import socket, threading
+
+from d3.mcd import ACK, CMD
+
+##################
+# Cell state codes
+##################
+HRS = 0
+LRS = 1
+
+######################
+# class SimulatedMC
+######################
+class SimulatedMC:
+	"""
+		Simulated µc of Design3, speaking the serial protocol of mcd.MCDriver over a localhost TCP socket
+
+		Usage:
+			sim = SimulatedMC().start()
+			driver = Design3Driver(uc_url=sim.url, b1530_addr=None, k2230g_addr=None)
+
+		...
+		Attributes
+		----------
+		r, rb: List[int]
+			The states (HRS or LRS) of the memristors R and Rb of the 64 cells, all HRS initially
+
+		ack_mode: ACK
+			The current ack mode
+
+		drop_acks: int
+			Number of the next acks not to send, to simulate a lost frame
+
+		drop_returns: int
+			Number of the next sense values to cut short, to simulate a partial frame
+
+		drop_debug: int
+			Number of the next DEBUG_ECHO/DEBUG_LED replies not to send, to simulate a lost frame
+
+		url: str
+			The pyserial URL to connect to, once started
+	"""
+
+	def __init__(self, host = 'localhost', port = 0):
+		"""
+		Parameters:
+			host: str : The address to listen on ['localhost' by default]
+			port: int : The port to listen on, 0 for any free port [0 by default]
+		"""
+		self.r         = [HRS] * 64
+		self.rb        = [HRS] * 64
+		self.ack_mode  = ACK.NONE
+
+		self.drop_acks    = 0
+		self.drop_returns = 0
+		self.drop_debug   = 0
+
+		self._sock = socket.create_server((host, port))
+		self._thread = None
+		self._running = False
+
+	@property
+	def url(self) -> str:
+		host, port = self._sock.getsockname()[:2]
+		return f"socket://{host}:{port}"
+
+	def start(self):
+		"""Serves the connections in a background thread, returns self."""
+		self._running = True
+		self._thread = threading.Thread(target=self._serve, daemon=True)
+		self._thread.start()
+		return self
+
+	def stop(self):
+		"""Stops serving and closes the socket."""
+		self._running = False
+		self._sock.close()
+
+	def sense_values(self) -> bytes:
+		"""Returns the 64 '0bXY' values read out, X is set if Rb is LRS and Y if R is LRS (see 'Design3Driver.ternary_to_repr')."""
+		return bytes((rb << 1) | r for r, rb in zip(self.r, self.rb))
+
+	def _serve(self):
+		while self._running:
+			try:
+				conn, _ = self._sock.accept()
+			except OSError: # Socket closed by 'stop'
+				return
+
+			with conn:
+				self._handle(conn)
+
+	def _handle(self, conn):
+		# Frames: 0xAA, CMD, data..., 0xAA ; packets ending with 0xAB are continued by a packet of data only
+		frame = None
+		while True:
+			try:
+				chunk = conn.recv(4096)
+			except OSError:
+				return
+			if len(chunk) == 0:
+				return
+
+			for b in chunk:
+				if frame is None:
+					if b == 0xAA:
+						frame = bytearray()
+				elif b == 0xAA and len(frame) != 0:
+					conn.sendall(self._execute(frame[0], bytes(frame[1:])))
+					frame = None
+				elif b != 0xAB or len(frame) == 0:
+					frame.append(b)
+
+	def _ack(self, command) -> bytes:
+		if self.drop_acks > 0:
+			self.drop_acks -= 1
+			return b''
+		return bytes([0xAA, command])
+
+	def _execute(self, command, data: bytes) -> bytes:
+		"""Executes a command, returns the bytes to send back."""
+		if command == CMD.ACK_MODE:
+			self.ack_mode = ACK(data[0]) if len(data) != 0 else ACK.NONE
+			return self._ack(command) if self.ack_mode != ACK.NONE else b''
+
+		if command in (CMD.SET, CMD.RESET):
+			state = LRS if command == CMD.SET else HRS
+			for i, v in enumerate(data[:64]):
+				if v & 0b10:
+					self.r[i] = state
+				if v & 0b01:
+					self.rb[i] = state
+
+		elif command in (CMD.SENSE, CMD.SENSE_UC):
+			if self.drop_returns > 0:
+				self.drop_returns -= 1
+				return self.sense_values()[:32]
+			return self.sense_values()
+
+		elif command in (CMD.DEBUG_ECHO, CMD.DEBUG_LED):
+			if self.drop_debug > 0:
+				self.drop_debug -= 1
+				return b''
+			return data if command == CMD.DEBUG_ECHO else b'Hello, C2N!'
+
+		# WRITE_CS, SET_ADR, CLK, CLK2: nothing to simulate
+		ack = ACK.__members__.get(CMD(command).name, ACK.NONE)
+		return self._ack(command) if ack & self.ack_mode else b''
@@ -0,0 +1,191 @@
+import numpy as np
+
+from d3.codes import INVALID_REPR, TERNARY_TO_REPR_TABLE
+
+#################
+# Utils function
+#################
+def popcount2(v: np.ndarray) -> np.ndarray:
+	"""Returns the number of bits set in the 2-bit values '0bXY'."""
+	return ((v & 0b01) + ((v >> 1) & 0b01)).astype(np.int64)
+
+#################
+# class CellStats
+#################
+class CellStats:
+	"""
+		Streaming per-cell statistics over sensed frames, in constant memory
+
+		...
+		Attributes
+		----------
+		pattern: np.ndarray
+			The ternary pattern programmed (see 'Design3Driver.fill'), the frames are compared against
+
+		count: int
+			Number of frames ingested
+
+		bit_errors: np.ndarray
+			Per cell, number of memristors read in the wrong state, summed over the frames (0 to 2 per frame)
+
+		invalid: np.ndarray
+			Per cell, number of frames read '0b11'
+
+		flips_to_lrs, flips_to_hrs: np.ndarray
+			Per cell, number of memristors read HRS then LRS (resp. LRS then HRS) in two consecutive frames
+
+		mean_t, m2_t: float
+			Mean of the frame times and sum of their squared deviations from it
+
+		mean_e, m2_e: np.ndarray
+			Per cell, mean of the bit errors per frame and sum of their squared deviations from it
+
+		c_et: np.ndarray
+			Per cell, co-moment of the bit errors per frame and the frame times (sum of the products of their deviations)
+
+		Details:
+			The moments are kept centred (Welford's method, combined with Chan's pairwise formulas),
+			so that they stay accurate with large frame times such as time.time() stamps.
+	"""
+
+	def __init__(self, pattern):
+		"""
+		Parameters:
+			pattern: List[List[int]] or np.ndarray : 2D array of '1', '-1' or '0', usually 8x8 (see 'Design3Driver.fill')
+		"""
+		pattern = np.asarray(pattern, dtype=int)
+		if pattern.ndim != 2 or not np.isin(pattern, (-1, 0, 1)).all():
+			raise ValueError("Expected 2D array of ternary values ('1', '-1' or '0')")
+
+		self.pattern   = pattern
+		self._expected = TERNARY_TO_REPR_TABLE[pattern + 1]
+		self._last     = None # Last frame ingested, to count the flips
+
+		shape = pattern.shape
+		self.count        = 0
+		self.bit_errors   = np.zeros(shape, dtype=np.int64)
+		self.invalid      = np.zeros(shape, dtype=np.int64)
+		self.flips_to_lrs = np.zeros(shape, dtype=np.int64)
+		self.flips_to_hrs = np.zeros(shape, dtype=np.int64)
+
+		self.mean_t = 0.0
+		self.m2_t   = 0.0
+		self.mean_e = np.zeros(shape, dtype=np.float64)
+		self.m2_e   = np.zeros(shape, dtype=np.float64)
+		self.c_et   = np.zeros(shape, dtype=np.float64)
+
+	def update(self, frame, t: float = None):
+		"""
+		Ingests one frame.
+
+		Parameters:
+			frame: 2D array of '0bXY' values, as returned by 'Design3Driver.sense'
+			t: float : The time of the frame (e.g. seconds since programming), or None for the frame index [None by default]
+		"""
+		self.update_many([frame], None if t is None else [t])
+
+	def update_many(self, frames, times = None):
+		"""
+		Ingests a batch of frames, see 'update'.
+
+		Parameters:
+			frames: 3D array, the batch of frames
+			times: 1D array, the time of each frame, or None for the frame indices [None by default]
+		"""
+		codes = np.asarray(frames).astype(np.uint8).reshape(-1, *self.pattern.shape)
+		n = len(codes)
+		if n == 0:
+			return
+
+		if times is None:
+			times = np.arange(self.count, self.count + n, dtype=np.float64)
+		times = np.asarray(times, dtype=np.float64)
+		if times.shape != (n,):
+			raise ValueError(f"Expected {n} times, got shape {times.shape}")
+
+		errors = popcount2(codes ^ self._expected)
+		self.bit_errors += errors.sum(axis=0)
+		self.invalid    += (codes == INVALID_REPR).sum(axis=0)
+
+		sequence = codes if self._last is None else np.concatenate([self._last[None], codes])
+		previous, current = sequence[:-1], sequence[1:]
+		self.flips_to_lrs += popcount2(current & ~previous & 0b11).sum(axis=0)
+		self.flips_to_hrs += popcount2(previous & ~current & 0b11).sum(axis=0)
+		self._last = codes[-1].copy()
+
+		# Centred moments of the batch, then combined with the running ones
+		mean_t = times.mean()
+		mean_e = errors.mean(axis=0)
+		dt = times - mean_t
+		de = errors - mean_e
+		self._combine(n, mean_t, (dt ** 2).sum(), mean_e, (de ** 2).sum(axis=0), (de * dt[:, None, None]).sum(axis=0))
+
+	def _combine(self, n, mean_t, m2_t, mean_e, m2_e, c_et):
+		# Chan's pairwise update of the centred moments, with the ones of n other frames
+		total = self.count + n
+		if total == 0:
+			return
+
+		dt = mean_t - self.mean_t
+		de = mean_e - self.mean_e
+		weight = self.count * n / total
+
+		self.mean_t += dt * n / total
+		self.mean_e  = self.mean_e + de * n / total
+		self.m2_t   += m2_t + dt ** 2 * weight
+		self.m2_e    = self.m2_e + m2_e + de ** 2 * weight
+		self.c_et    = self.c_et + c_et + de * dt * weight
+		self.count   = total
+
+	def snapshot(self):
+		"""Returns an independent copy of the statistics, e.g. to analyse them while the run goes on."""
+		other = CellStats(self.pattern)
+		other.merge(self)
+		other._last = None if self._last is None else self._last.copy()
+		return other
+
+	def merge(self, other):
+		"""
+		Adds up the statistics of another run (e.g. in parallel or on another device) with the same pattern.
+
+		Details:
+			The flips between the last frame of a run and the first one of the other are not counted.
+
+		Returns:
+			self
+		"""
+		if not np.array_equal(self.pattern, other.pattern):
+			raise ValueError("Cannot merge statistics of different patterns")
+
+		self.bit_errors   += other.bit_errors
+		self.invalid      += other.invalid
+		self.flips_to_lrs += other.flips_to_lrs
+		self.flips_to_hrs += other.flips_to_hrs
+
+		self._combine(other.count, other.mean_t, other.m2_t, other.mean_e, other.m2_e, other.c_et)
+		return self
+
+	##### METRICS #####
+	@property
+	def ber(self) -> np.ndarray:
+		"""Per cell bit error rate, over the 2 memristors of each cell."""
+		with np.errstate(invalid='ignore', divide='ignore'):
+			return self.bit_errors / (2 * self.count)
+
+	@property
+	def invalid_rate(self) -> np.ndarray:
+		"""Per cell rate of '0b11' values read."""
+		with np.errstate(invalid='ignore', divide='ignore'):
+			return self.invalid / self.count
+
+	@property
+	def error_var(self) -> np.ndarray:
+		"""Per cell variance of the number of bit errors per frame."""
+		with np.errstate(invalid='ignore', divide='ignore'):
+			return self.m2_e / self.count
+
+	@property
+	def drift(self) -> np.ndarray:
+		"""Per cell retention drift: the least-squares slope of the bit errors per frame against the frame time."""
+		with np.errstate(invalid='ignore', divide='ignore'):
+			return self.c_et / self.m2_t
@@ -0,0 +1,228 @@
+import numpy as np
+
+import copy, json, os
+from typing import Any, Callable, Dict, List
+
+#############################
+# Grid parameter costs
+# The most expensive parameters to change are swept in the outer loops
+COST_PROGRAM = 4 # Rewrites the array: 'pattern', 'otp' and the 'SET'/'RESET'/'FORM' voltages
+COST_SUPPLY  = 3 # Supply transition: the 'SENSE' voltages
+COST_WGFMU   = 2 # WGFMU reconfiguration (see 'Design3Driver.configure_wgfmu_default')
+COST_OTHER   = 1
+
+WGFMU_PARAMS   = ('precharge_time', 'discharge_time', 'interval', 'clk_len')
+PROGRAM_PARAMS = ('pattern', 'otp')
+
+#################
+# Utils function
+#################
+def param_cost(name: str) -> int:
+	"""
+	Returns the cost of changing the grid parameter 'name' (see 'Grid parameter costs').
+	"""
+	if name in PROGRAM_PARAMS:
+		return COST_PROGRAM
+	if name.startswith('voltages.'):
+		return COST_SUPPLY if name.split('.')[1] == 'SENSE' else COST_PROGRAM
+	if name in WGFMU_PARAMS:
+		return COST_WGFMU
+	return COST_OTHER
+
+def snake_product(values: List[List[Any]]):
+	"""
+	Cartesian product of the lists provided, where every other inner loop is reversed.
+
+	Details:
+		Two consecutive tuples differ by exactly one value, e.g.:
+		snake_product([[0, 1], ['a', 'b']]) -> (0, 'a'), (0, 'b'), (1, 'b'), (1, 'a')
+	"""
+	if len(values) == 0:
+		yield ()
+		return
+
+	inner = list(snake_product(values[1:]))
+	for k, v in enumerate(values[0]):
+		for rest in (inner if k % 2 == 0 else reversed(inner)):
+			yield (v,) + rest
+
+def _to_json(obj):
+	if isinstance(obj, np.ndarray):
+		return obj.tolist()
+	if isinstance(obj, np.generic):
+		return obj.item()
+	raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def point_key(point: Dict[str, Any]) -> str:
+	"""
+	Returns the identifier of a grid point, as stored in the checkpoint file.
+	"""
+	return json.dumps(point, sort_keys=True, default=_to_json)
+
+###############
+# class Sweep
+###############
+class Sweep:
+	"""
+		Parameter sweep over a Design3Driver, checkpointed and resumable
+
+		...
+		Attributes
+		----------
+		driver: Design3Driver
+			The driver the parameters are applied to
+
+		grid: dict(str, list)
+			The values to sweep for each parameter
+			Details:
+				'voltages.<OP>.<RAIL>': sets driver.voltages[OP][RAIL], e.g. 'voltages.SENSE.VDDR'
+				'pattern': fills the array with the ternary pattern (see 'Design3Driver.fill')
+				'otp': fill mode of the pattern
+				any other name: sets the driver attribute, e.g. 'precharge_time', 'discharge_time'
+
+		measure: func(driver, point) -> result
+			The measurement to run at each point, the result must be JSON serializable (NumPy arrays are converted to lists)
+
+		checkpoint: str
+			Path to the file storing the completed points, one JSON object per line, or None not to checkpoint
+
+		retries: int
+			Number of times a point is retried after an exception, calling 'driver.reset_state' in between
+			Details:
+				The WGFMU timings and the voltages set before the sweep are restored after 'reset_state'
+	"""
+
+	def __init__(self, driver, grid: Dict[str, List[Any]], measure: Callable, checkpoint: str = None, retries: int = 0):
+		for name, values in grid.items():
+			if len(values) == 0:
+				raise ValueError(f"No value to sweep for '{name}'")
+
+			# Reject unknown names, a typo would otherwise measure the same settings at every point
+			if name in PROGRAM_PARAMS:
+				continue
+			if name.startswith('voltages.'):
+				parts = name.split('.')
+				if len(parts) != 3 or parts[2] not in driver.voltages.get(parts[1], {}):
+					raise ValueError(f"Expected 'voltages.<OP>.<RAIL>' with OP and RAIL from driver.voltages, got '{name}'")
+			elif not hasattr(driver, name):
+				raise ValueError(f"Unknown parameter '{name}', the driver has no such attribute")
+
+		self.driver     = driver
+		self.grid       = grid
+		self.measure    = measure
+		self.checkpoint = checkpoint
+		self.retries    = retries
+
+	def points(self) -> List[Dict[str, Any]]:
+		"""
+		Returns the grid points, in the order they will be run.
+
+		Details:
+			The parameters are sorted by cost (see 'Grid parameter costs'), the most expensive in the outer loops,
+			and the inner loops go back and forth so that two consecutive points differ by a single parameter.
+		"""
+		names = sorted(self.grid, key=param_cost, reverse=True) # sorted is stable, ties keep the grid order
+		return [ dict(zip(names, values)) for values in snake_product([self.grid[n] for n in names]) ]
+
+	def load_checkpoint(self) -> Dict[str, Any]:
+		"""
+		Returns the results already stored in the checkpoint file, by point key (see 'point_key').
+
+		Details:
+			A truncated last line, left by a crash during writing, is ignored and cut off the file,
+			so that the next points are appended after the last complete one.
+		"""
+		done = dict()
+		if self.checkpoint is None or not os.path.exists(self.checkpoint):
+			return done
+
+		with open(self.checkpoint, 'rb+') as f:
+			complete = 0 # Offset right after the last complete line
+			for line in f:
+				if not line.endswith(b'\n'):
+					break
+				complete += len(line)
+
+				try:
+					entry = json.loads(line)
+				except json.JSONDecodeError:
+					continue
+				done[point_key(entry['point'])] = entry['result']
+
+			f.truncate(complete)
+
+		return done
+
+	def apply(self, point: Dict[str, Any], previous: Dict[str, Any] = None):
+		"""
+		Applies the parameters of 'point' which differ from 'previous' to the driver.
+
+		Parameters:
+			point: dict(str, Any) : The grid point to apply
+			previous: dict(str, Any) : The grid point last applied, or None to apply everything [None by default]
+		"""
+		refill = False
+		for name, value in point.items():
+			if previous is not None and point_key(previous[name]) == point_key(value):
+				continue
+
+			if name.startswith('voltages.'):
+				_, op, rail = name.split('.')
+				self.driver.voltages[op][rail] = value
+			elif name not in PROGRAM_PARAMS:
+				setattr(self.driver, name, value)
+
+			refill |= (param_cost(name) == COST_PROGRAM)
+
+		if refill and 'pattern' in point:
+			self.driver.fill(point['pattern'], otp=point.get('otp', False))
+
+	def run(self) -> List[Any]:
+		"""
+		Runs the sweep, skipping the points already in the checkpoint file.
+
+		Returns:
+			List[Tuple[dict(str, Any), Any]] : The (point, result) of every grid point, in run order
+		"""
+		done = self.load_checkpoint()
+		results = []
+		previous = None
+
+		# Driver settings lost by 'reset_state', restored before retrying a point
+		baseline = { name: getattr(self.driver, name) for name in WGFMU_PARAMS }
+		baseline_voltages = copy.deepcopy(self.driver.voltages)
+
+		f = open(self.checkpoint, 'a') if self.checkpoint is not None else None
+		try:
+			for point in self.points():
+				key = point_key(point)
+				if key in done:
+					results.append((point, done[key]))
+					continue
+
+				for attempt in range(self.retries + 1):
+					try:
+						self.apply(point, previous)
+						previous = point
+						result = self.measure(self.driver, point)
+						break
+					except Exception as e:
+						if attempt == self.retries:
+							raise e
+						self.driver.reset_state()
+						for name, value in baseline.items():
+							setattr(self.driver, name, value)
+						self.driver.voltages = copy.deepcopy(baseline_voltages)
+						previous = None # The driver state is lost, everything has to be applied again
+
+				if f is not None:
+					f.write(json.dumps({'point': point, 'result': result}, default=_to_json) + '\n')
+					f.flush()
+					os.fsync(f.fileno())
+
+				results.append((point, result))
+		finally:
+			if f is not None:
+				f.close()
+
+		return results
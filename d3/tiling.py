@@ -0,0 +1,212 @@
+import numpy as np
+
+from typing import Dict, Tuple
+
+TILE_SIZE = 8 # Size of a Design3 array
+
+#################
+# Utils function
+#################
+def split(matrix) -> Dict[Tuple[int, int], np.ndarray]:
+	"""
+	Splits a 2D matrix into 8x8 tiles, padding the last row and column of tiles with '0'.
+
+	Parameters:
+		matrix: List[List[int]] or np.ndarray : The 2D matrix to split
+
+	Returns:
+		dict((tile_row, tile_col), np.ndarray) : The 8x8 tiles, by position
+	"""
+	matrix = np.asarray(matrix, dtype=int)
+	if matrix.ndim != 2:
+		raise ValueError(f"Expected 2D array, got shape {matrix.shape}")
+
+	tile_rows = -(-matrix.shape[0] // TILE_SIZE)
+	tile_cols = -(-matrix.shape[1] // TILE_SIZE)
+
+	padded = np.zeros((tile_rows * TILE_SIZE, tile_cols * TILE_SIZE), dtype=int)
+	padded[:matrix.shape[0], :matrix.shape[1]] = matrix
+
+	return {
+		(i, j): padded[i*TILE_SIZE:(i+1)*TILE_SIZE, j*TILE_SIZE:(j+1)*TILE_SIZE]
+		for i in range(tile_rows)
+		for j in range(tile_cols)
+	}
+
+def stitch(tiles: Dict[Tuple[int, int], np.ndarray], shape) -> np.ndarray:
+	"""
+	Stitches 8x8 tiles back together, inverse of 'split'.
+
+	Parameters:
+		tiles: dict((tile_row, tile_col), np.ndarray) : The 8x8 tiles, by position
+		shape: (int, int) : The shape of the original matrix, the padding is cropped out
+
+	Returns:
+		np.ndarray : The 2D matrix
+	"""
+	tile_rows = -(-shape[0] // TILE_SIZE)
+	tile_cols = -(-shape[1] // TILE_SIZE)
+
+	matrix = np.zeros((tile_rows * TILE_SIZE, tile_cols * TILE_SIZE), dtype=int)
+	for (i, j), tile in tiles.items():
+		matrix[i*TILE_SIZE:(i+1)*TILE_SIZE, j*TILE_SIZE:(j+1)*TILE_SIZE] = tile
+
+	return matrix[:shape[0], :shape[1]]
+
+#####################
+# class TiledMatrix
+#####################
+class TiledMatrix:
+	"""
+		Maps an arbitrary-size ternary matrix onto one or several 8x8 Design3 arrays
+
+		...
+		Attributes
+		----------
+		drivers: List[Design3Driver]
+			The drivers of the arrays available, the tiles are time-multiplexed on them
+
+		shape: (int, int)
+			The shape of the matrix
+
+		otp: bool
+			Program the tiles in OTP mode or not (see 'Design3Driver.fill')
+
+		groups: List[Tuple[np.ndarray, List[Tuple[int, int]]]]
+			The distinct 8x8 tiles, each with the list of positions (tile_row, tile_col) where it appears
+
+		rewrites: int
+			The number of times an array has actually been written, the resident tiles are not rewritten
+	"""
+
+	def __init__(self, drivers, matrix, otp=False):
+		"""
+		Splits the matrix into tiles, nothing is written to the arrays until the first operation.
+
+		Parameters:
+			drivers: Design3Driver or List[Design3Driver] : The driver(s) of the arrays to use
+			matrix: List[List[int]] or np.ndarray : 2D array of '1', '-1' or '0', of any size
+			otp: bool : See 'Design3Driver.fill' [False by default]
+		"""
+		if not isinstance(drivers, (list, tuple)):
+			drivers = [drivers]
+		if len(drivers) == 0:
+			raise ValueError("Expected at least one driver")
+
+		matrix = np.asarray(matrix, dtype=int)
+		if not np.isin(matrix, (-1, 0, 1)).all():
+			raise ValueError("Expected ternary weights ('1', '-1' or '0')")
+
+		self.drivers  = list(drivers)
+		self.shape    = matrix.shape
+		self.otp      = otp
+		self.rewrites = 0
+
+		# Identical tiles (e.g. the padding ones) are grouped to be written only once
+		groups = dict()
+		for pos, tile in split(matrix).items():
+			groups.setdefault(tile.tobytes(), (tile, []))[1].append(pos)
+		self.groups = list(groups.values())
+
+	def schedule(self, skip_zero=False):
+		"""
+		Assigns the tiles to the arrays and orders them to minimise reprogramming.
+
+		Parameters:
+			skip_zero: bool : Leave out the all-zero tiles, e.g. when their contribution is known to be zero [False by default]
+
+		Returns:
+			List[Tuple[Design3Driver, np.ndarray, List[Tuple[int, int]]]] : The (driver, tile, positions) to run, in order
+
+		Details:
+			A tile already resident in an array is assigned to it and run first.
+			The other tiles are spread over the least loaded arrays.
+		"""
+		plan = [[] for _ in self.drivers]
+
+		remaining = []
+		for tile, positions in self.groups:
+			if skip_zero and not tile.any():
+				continue
+
+			for k, driver in enumerate(self.drivers):
+				if len(plan[k]) == 0 and driver.is_resident(tile):
+					plan[k].append((driver, tile, positions))
+					break
+			else:
+				remaining.append((tile, positions))
+
+		for tile, positions in remaining:
+			k = min(range(len(plan)), key=lambda k: len(plan[k]))
+			plan[k].append((self.drivers[k], tile, positions))
+
+		return [step for steps in plan for step in steps]
+
+	def _program(self, driver, tile):
+		if driver.program_weights(tile, self.otp):
+			self.rewrites += 1
+
+	def vmm(self, inputs, sense_every=1, measure_pulses=False, sense_uc=False):
+		"""
+		Evaluates a batch of vector-matrix multiplies with the whole matrix
+
+		Parameters:
+			inputs: 1D input vector of size shape[0] or 2D batch of input vectors (one per row)
+			sense_every: See 'Design3Driver.vmm' [1 by default]
+			measure_pulses, sense_uc: See 'Design3Driver.sense'
+
+		Returns:
+			np.ndarray : The output vector, or the batch of output vectors (one per row), of size shape[1]
+			Details:
+				Same as 'Design3Driver.vmm_reference(matrix, inputs)'
+
+		Details:
+			All-zero tiles (e.g. the padding) are neither programmed nor read out, their partial outputs are zero.
+			Each other distinct tile is programmed once, then evaluated for the whole batch at all of its positions,
+			with one readout every 'sense_every' (vector, position) pairs. The partial outputs are summed up per tile column.
+		"""
+		inputs = np.asarray(inputs)
+		single = (inputs.ndim == 1)
+		inputs = np.atleast_2d(inputs)
+		if inputs.ndim != 2 or inputs.shape[1] != self.shape[0]:
+			raise ValueError(f"Expected input vectors of size {self.shape[0]}, got shape {inputs.shape}")
+
+		batch_size = len(inputs)
+		tile_rows = -(-self.shape[0] // TILE_SIZE)
+		tile_cols = -(-self.shape[1] // TILE_SIZE)
+
+		padded = np.zeros((batch_size, tile_rows * TILE_SIZE), dtype=inputs.dtype)
+		padded[:, :self.shape[0]] = inputs
+		outputs = np.zeros((batch_size, tile_cols * TILE_SIZE), dtype=np.result_type(inputs, int))
+
+		for driver, tile, positions in self.schedule(skip_zero=True):
+			self._program(driver, tile)
+
+			stacked = np.concatenate([padded[:, i*TILE_SIZE:(i+1)*TILE_SIZE] for i, _ in positions])
+			partials = driver.vmm(stacked, sense_every=sense_every, measure_pulses=measure_pulses, sense_uc=sense_uc)
+
+			for k, (_, j) in enumerate(positions):
+				outputs[:, j*TILE_SIZE:(j+1)*TILE_SIZE] += partials[k*batch_size:(k+1)*batch_size]
+
+		outputs = outputs[:, :self.shape[1]]
+		return outputs[0] if single else outputs
+
+	def read(self, measure_pulses=False, sense_uc=False) -> np.ndarray:
+		"""
+		Reads out the whole matrix, tile by tile
+
+		Parameters:
+			measure_pulses, sense_uc: See 'Design3Driver.sense'
+
+		Returns:
+			np.ndarray : The sensed matrix, decoded as '1', '-1' or '0' (see 'Design3Driver.repr_to_ternary')
+		"""
+		tiles = dict()
+		for driver, tile, positions in self.schedule():
+			self._program(driver, tile)
+
+			sensed = driver.repr_to_ternary(driver.sense(measure_pulses, sense_uc))
+			for pos in positions:
+				tiles[pos] = sensed
+
+		return stitch(tiles, self.shape)
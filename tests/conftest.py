@@ -0,0 +1,28 @@
+import pytest
+
+from d3 import Design3Driver
+from d3.sim import SimulatedMC
+
+@pytest.fixture
+def sim():
+	sim = SimulatedMC().start()
+	yield sim
+	sim.stop()
+
+@pytest.fixture
+def driver(sim):
+	driver = Design3Driver(uc_url=sim.url, b1530_addr=None, k2230g_addr=None)
+	driver._mcd.ser.timeout = 0.2 # Lost frames are detected faster than with DEFAULT_TIMEOUT
+	yield driver
+	driver.__del__()
+
+@pytest.fixture
+def count_senses(driver):
+	"""Counts the array readouts made through 'driver.sense'."""
+	senses = [0]
+	sense = driver.sense
+	def counting_sense(*args, **kwargs):
+		senses[0] += 1
+		return sense(*args, **kwargs)
+	driver.sense = counting_sense
+	return senses
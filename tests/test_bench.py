@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from d3 import Design3Driver
+from d3.bench import BenchServer, BenchClient
+from d3.sim import SimulatedMC
+
+# 8x8 ternary pattern with every value on every row and column
+PATTERN = [[((row + col) % 3) - 1 for col in range(8)] for row in range(8)]
+
+@pytest.fixture
+def bench():
+	sim = SimulatedMC().start()
+	driver = Design3Driver(uc_url=sim.url, b1530_addr=None, k2230g_addr=None)
+	driver._mcd.ser.timeout = 0.2 # Lost frames are detected faster than with DEFAULT_TIMEOUT
+	server = BenchServer(driver, port=0).start()
+	client = BenchClient(*server.address)
+
+	yield sim, driver, server, client
+
+	client.close()
+	server.shutdown()
+	sim.stop()
+
+def test_fill_sense_burst(bench):
+	_, _, _, client = bench
+
+	client.fill(PATTERN)
+
+	values = client.sense(sense_uc=True)
+	assert values.dtype == np.uint8
+	assert np.array_equal(Design3Driver.repr_to_ternary(values), PATTERN)
+
+	frames = client.burst(5, sense_uc=True)
+	assert frames.shape == (5, 8, 8)
+	assert all(np.array_equal(f, values) for f in frames)
+
+def test_set_voltages_without_supply(bench):
+	_, _, _, client = bench
+
+	with pytest.raises(RuntimeError, match="No power supply"):
+		client.set_voltages(VDD=1.2)
+
+	client.sense(sense_uc=True) # The server is still usable
+
+def test_several_clients(bench):
+	_, _, server, client = bench
+	others = [BenchClient(*server.address) for _ in range(3)]
+
+	client.fill(PATTERN)
+	for c in others:
+		assert np.array_equal(Design3Driver.repr_to_ternary(c.burst(10, sense_uc=True)), [PATTERN] * 10)
+
+	assert server.stats['requests'] == 1 + len(others)
+
+	for c in others:
+		c.close()
+
+def test_abandoned_stream(bench):
+	_, _, server, client = bench
+
+	stream = client.iter_sense(3, sense_uc=True)
+	next(stream)
+	del stream
+
+	client.fill(PATTERN) # The 2 frames left and the end of the stream are skipped
+	assert np.array_equal(Design3Driver.repr_to_ternary(client.sense(sense_uc=True)), PATTERN)
+	assert server.stats['requests'] == 3
+
+	first = client.iter_sense(3, sense_uc=True)
+	next(first)
+	assert client.burst(2, sense_uc=True).shape == (2, 8, 8)
+	assert list(first) == [] # Drained by the burst
+
+def test_disconnect_cancels_burst(bench):
+	_, driver, server, client = bench
+
+	senses = [0]
+	sense = driver.sense
+	def counting_sense(*args, **kwargs):
+		senses[0] += 1
+		return sense(*args, **kwargs)
+	driver.sense = counting_sense
+
+	leaving = BenchClient(*server.address)
+	next(leaving.iter_sense(1000, sense_uc=True))
+	leaving.close()
+
+	client.sense(sense_uc=True) # Queued after the burst, returns once it has been cancelled
+	assert senses[0] < 1000
+
+def test_resync_partial_sense(bench):
+	sim, driver, _, client = bench
+
+	client.fill(PATTERN)
+	sim.drop_returns = 1
+	values = client.sense(sense_uc=True)
+
+	assert np.array_equal(Design3Driver.repr_to_ternary(values), PATTERN)
+	assert driver._mcd.link_stats['retries'] == 1
@@ -0,0 +1,25 @@
+from d3 import mcd
+
+def test_debug_echo(driver):
+	assert driver._mcd.debug_echo(1, 2, 3) == b'\x01\x02\x03'
+	assert driver._mcd.link_stats['retries'] == 0
+
+def test_resync_dropped_echo(sim, driver):
+	sim.drop_debug = 1
+	assert driver._mcd.debug_echo(1, 2, 3) == b'\x01\x02\x03'
+
+	assert driver._mcd.link_stats['resyncs'] == 1
+	assert driver._mcd.link_stats['retries'] == 1
+
+def test_resync_dropped_led(sim, driver):
+	sim.drop_debug = 1
+	assert driver._mcd.debug_led() == b'Hello, C2N!'
+
+	assert driver._mcd.link_stats['retries'] == 1
+
+def test_resync_dropped_ack(sim, driver):
+	sim.drop_acks = 1
+	driver._mcd.write_cs(mcd.CS.CBLEN, mcd.State.SET)
+
+	assert driver._mcd.link_stats['resyncs'] == 1
+	assert driver._mcd.link_stats['retries'] == 1
@@ -0,0 +1,62 @@
+import pytest
+
+from d3.method_decorator import method
+
+class Driver:
+	def __init__(self):
+		self.offset = 10
+
+	def sense(self, a):
+		return self.offset + a
+
+@pytest.fixture
+def driver():
+	return Driver()
+
+def test_return_value(driver):
+	@method(driver)
+	def sense(self, a):
+		return self.offset * a
+
+	assert driver.sense(2) == 20
+	assert sense(3) == 30 # Can also be called as a function, with self set to driver
+	assert driver.sense.__self__ is driver
+
+def test_parent_chaining(driver):
+	@method(driver)
+	def sense(self, a, parent):
+		return parent(a) * 2
+
+	@method(driver)
+	def sense(self, a, parent):
+		return parent(a) + 1
+
+	assert driver.sense(1) == (10 + 1) * 2 + 1
+	assert Driver().sense(1) == 11 # Only the instance is extended
+
+def test_keyword_only_parent(driver):
+	@method(driver)
+	def sense(self, a, b=5, *, parent):
+		return parent(a) + b
+
+	assert driver.sense(1) == 16
+	assert driver.sense(1, b=0) == 11
+
+def test_static_method(driver):
+	@method(driver)
+	def double(x):
+		return 2 * x
+
+	assert driver.double(4) == 8
+
+def test_parent_not_last(driver):
+	with pytest.raises(ValueError):
+		@method(driver)
+		def sense(self, parent, a):
+			return parent(a)
+
+def test_parent_without_default_implementation(driver):
+	with pytest.raises(ValueError):
+		@method(driver)
+		def measure(self, parent):
+			return parent()
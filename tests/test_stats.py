@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from d3.stats import CellStats, popcount2
+
+PATTERN = [[1, -1]] # Expected '0b10' and '0b01'
+
+# Cell 0: right, invalid (Y flips to LRS), both bits flip to HRS
+# Cell 1: right, right, both bits wrong (X flips to LRS, Y to HRS)
+FRAMES = [
+	[[0b10, 0b01]],
+	[[0b11, 0b01]],
+	[[0b00, 0b10]],
+]
+
+def random_run(n, seed=0):
+	rng = np.random.default_rng(seed)
+	pattern = rng.integers(-1, 2, size=(8, 8))
+	frames = rng.integers(0, 4, size=(n, 8, 8), dtype=np.uint8)
+	times = 1.76e9 + np.cumsum(rng.uniform(0.1, 1.0, size=n)) # time.time() like stamps
+	return pattern, frames, times
+
+def assert_same(a, b):
+	assert a.count == b.count
+	assert np.array_equal(a.bit_errors, b.bit_errors)
+	assert np.array_equal(a.invalid, b.invalid)
+	# The frame times are ~1e9, the order of the last bits of their mean
+	for name in ('mean_t', 'm2_t', 'mean_e', 'm2_e', 'c_et'):
+		np.testing.assert_allclose(getattr(a, name), getattr(b, name), rtol=1e-6, atol=1e-9, err_msg=name)
+
+def test_known_sequence():
+	stats = CellStats(PATTERN)
+	for frame in FRAMES:
+		stats.update(frame)
+
+	assert stats.count == 3
+	assert stats.bit_errors.tolist()   == [[2, 2]]
+	assert stats.invalid.tolist()      == [[1, 0]]
+	assert stats.flips_to_lrs.tolist() == [[1, 1]]
+	assert stats.flips_to_hrs.tolist() == [[2, 1]]
+	np.testing.assert_allclose(stats.ber, [[2 / 6, 2 / 6]])
+	np.testing.assert_allclose(stats.invalid_rate, [[1 / 3, 0]])
+
+def test_invalid_pattern():
+	with pytest.raises(ValueError):
+		CellStats([[2, 0]])
+	with pytest.raises(ValueError):
+		CellStats([1, 0])
+
+def test_update_many_merge_equivalence():
+	pattern, frames, times = random_run(100)
+
+	one = CellStats(pattern)
+	for frame, t in zip(frames, times):
+		one.update(frame, t)
+
+	many = CellStats(pattern)
+	many.update_many(frames[:37], times[:37])
+	many.update_many(frames[37:], times[37:])
+
+	merged = CellStats(pattern).merge(CellStats(pattern)) # Merging an empty run changes nothing
+	merged.update_many(frames[:37], times[:37])
+	merged.merge(CellStats(pattern).merge(CellStats(pattern)))
+	other = CellStats(pattern)
+	other.update_many(frames[37:], times[37:])
+	merged.merge(other)
+
+	assert_same(one, many)
+	assert_same(one, merged)
+	for name in ('flips_to_lrs', 'flips_to_hrs'):
+		assert np.array_equal(getattr(one, name), getattr(many, name))
+
+	# The flips across the boundary of the merged runs are not counted
+	boundary = CellStats(pattern)
+	boundary.update_many(frames[36:38], times[36:38])
+	assert np.array_equal(merged.flips_to_lrs + boundary.flips_to_lrs, one.flips_to_lrs)
+	assert np.array_equal(merged.flips_to_hrs + boundary.flips_to_hrs, one.flips_to_hrs)
+
+def test_merge_different_patterns():
+	with pytest.raises(ValueError):
+		CellStats([[1]]).merge(CellStats([[-1]]))
+
+def test_drift_large_times():
+	pattern, frames, times = random_run(200, seed=1)
+	stats = CellStats(pattern)
+	stats.update_many(frames[:150], times[:150])
+	stats.update_many(frames[150:], times[150:])
+
+	errors = popcount2(frames ^ stats._expected).reshape(len(frames), -1)
+	slopes = np.polyfit(times - times[0], errors, 1)[0] # Shifted, as polyfit itself is not accurate with such times
+	np.testing.assert_allclose(stats.drift.ravel(), slopes, rtol=1e-6, atol=1e-9)
+	np.testing.assert_allclose(stats.error_var.ravel(), errors.var(axis=0), rtol=1e-9, atol=1e-12)
+
+def test_snapshot_independence():
+	pattern, frames, times = random_run(20, seed=2)
+	stats = CellStats(pattern)
+	stats.update_many(frames[:10], times[:10])
+
+	snapshot = stats.snapshot()
+	assert_same(snapshot, stats)
+	before = {name: np.copy(getattr(snapshot, name)) for name in ('bit_errors', 'flips_to_lrs', 'm2_e', 'c_et')}
+
+	stats.update_many(frames[10:], times[10:])
+	assert snapshot.count == 10
+	for name, value in before.items():
+		assert np.array_equal(getattr(snapshot, name), value)
+
+	# Continuing the snapshot gives the same statistics, the flips from the last frame included
+	snapshot.update_many(frames[10:], times[10:])
+	assert_same(snapshot, stats)
+	assert np.array_equal(snapshot.flips_to_lrs, stats.flips_to_lrs)
+	assert np.array_equal(snapshot.flips_to_hrs, stats.flips_to_hrs)
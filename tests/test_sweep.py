@@ -0,0 +1,124 @@
+import json
+import pytest
+
+from d3.sweep import Sweep
+
+PATTERN_A = [[1] * 8] * 8
+PATTERN_B = [[-1] * 8] * 8
+
+class FakeDriver:
+	"""Stands for a Design3Driver, only the attributes used by a sweep."""
+
+	def __init__(self):
+		self.voltages = {
+			'SET':   {'VDD': 1.2, 'VDDC': 3.5, 'VDDR': 3.0},
+			'SENSE': {'VDD': 1.2, 'VDDC': 1.2, 'VDDR': 2.5},
+		}
+		self.reset_state()
+		self.fills = []
+
+	def reset_state(self): # Same effect on the timings as Design3Driver.reset_state
+		self.precharge_time = None
+		self.discharge_time = None
+		self.interval       = 20e-6
+		self.clk_len        = 15e-6
+
+	def fill(self, values, otp=False):
+		self.fills.append(values)
+
+def settings(driver, point):
+	return {
+		'precharge_time': driver.precharge_time,
+		'discharge_time': driver.discharge_time,
+		'VDDR': driver.voltages['SENSE']['VDDR'],
+	}
+
+@pytest.fixture
+def driver():
+	driver = FakeDriver()
+	driver.precharge_time = 1e-6
+	driver.discharge_time = 2e-6
+	return driver
+
+def test_points_order(driver):
+	grid = {
+		'precharge_time': [1e-6, 2e-6],
+		'voltages.SENSE.VDDR': [2.0, 2.5],
+		'pattern': [PATTERN_A, PATTERN_B],
+	}
+	points = Sweep(driver, grid, settings).points()
+
+	assert len(points) == 8
+	assert list(points[0]) == ['pattern', 'voltages.SENSE.VDDR', 'precharge_time'] # Most expensive first
+	assert [p['precharge_time'] for p in points[:4]] == [1e-6, 2e-6, 2e-6, 1e-6] # Back and forth
+	for a, b in zip(points, points[1:]):
+		assert sum(a[n] != b[n] for n in grid) == 1
+
+def test_unknown_parameter(driver):
+	with pytest.raises(ValueError):
+		Sweep(driver, {'precharge_tme': [1e-6]}, settings)
+	with pytest.raises(ValueError):
+		Sweep(driver, {'voltages.SENSE.VDDX': [1.0]}, settings)
+	with pytest.raises(ValueError):
+		Sweep(driver, {'voltages.READ.VDD': [1.0]}, settings)
+
+def test_run_and_skip_done(driver, tmp_path):
+	checkpoint = tmp_path / 'sweep.jsonl'
+	grid = {'voltages.SENSE.VDDR': [2.0, 2.5, 3.0], 'pattern': [PATTERN_A, PATTERN_B]}
+
+	results = Sweep(driver, grid, settings, checkpoint=str(checkpoint)).run()
+	assert [r['VDDR'] for _, r in results] == [2.0, 2.5, 3.0, 3.0, 2.5, 2.0]
+	assert len(driver.fills) == 2 # Only when the pattern changes
+
+	measured = []
+	def measure(driver, point):
+		measured.append(point)
+		return settings(driver, point)
+
+	assert Sweep(driver, grid, measure, checkpoint=str(checkpoint)).run() == results
+	assert measured == []
+
+def test_resume_truncated_checkpoint(driver, tmp_path):
+	checkpoint = tmp_path / 'sweep.jsonl'
+	grid = {'voltages.SENSE.VDDR': [2.0, 2.5, 3.0, 3.5]}
+	Sweep(driver, grid, settings, checkpoint=str(checkpoint)).run()
+
+	data = checkpoint.read_bytes()
+	checkpoint.write_bytes(data[:-30]) # Crash while writing the last point
+
+	measured = []
+	def measure(driver, point):
+		measured.append(point['voltages.SENSE.VDDR'])
+		return settings(driver, point)
+
+	for _ in range(2):
+		Sweep(driver, grid, measure, checkpoint=str(checkpoint)).run()
+	assert measured == [3.5] # Measured again once, not at every resume
+
+	lines = checkpoint.read_text().splitlines()
+	assert len(lines) == 4
+	assert all(json.loads(line) for line in lines)
+
+def test_retry_restores_settings(driver):
+	failures = [1]
+	def measure(driver, point):
+		if failures[0] > 0:
+			failures[0] -= 1
+			raise IOError("USB hiccup")
+		return settings(driver, point)
+
+	driver.voltages['SENSE']['VDD'] = 1.0 # Set before the sweep, not swept
+	results = Sweep(driver, {'voltages.SENSE.VDDR': [2.0, 2.5]}, measure, retries=1).run()
+
+	assert [r for _, r in results] == [
+		{'precharge_time': 1e-6, 'discharge_time': 2e-6, 'VDDR': 2.0},
+		{'precharge_time': 1e-6, 'discharge_time': 2e-6, 'VDDR': 2.5},
+	]
+	assert driver.voltages['SENSE']['VDD'] == 1.0
+
+def test_retry_exhausted(driver):
+	def measure(driver, point):
+		raise IOError("USB unplugged")
+
+	with pytest.raises(IOError):
+		Sweep(driver, {'voltages.SENSE.VDDR': [2.0]}, measure, retries=2).run()
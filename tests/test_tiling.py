@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from d3 import Design3Driver, tiling
+from d3.sim import SimulatedMC
+
+@pytest.fixture
+def drivers():
+	sims = [SimulatedMC().start() for _ in range(2)]
+	drivers = [Design3Driver(uc_url=sim.url, b1530_addr=None, k2230g_addr=None) for sim in sims]
+	yield drivers
+	for driver in drivers:
+		driver.__del__()
+	for sim in sims:
+		sim.stop()
+
+def random_matrix(shape, seed=0):
+	return np.random.default_rng(seed).integers(-1, 2, shape)
+
+def test_split_stitch():
+	matrix = random_matrix((20, 13))
+	tiles = tiling.split(matrix)
+
+	assert sorted(tiles) == [(i, j) for i in range(3) for j in range(2)]
+	assert all(tile.shape == (8, 8) for tile in tiles.values())
+	assert not tiles[(2, 1)][4:, :].any() and not tiles[(2, 1)][:, 5:].any() # Zero padding
+	assert np.array_equal(tiling.stitch(tiles, matrix.shape), matrix)
+
+def test_vmm(driver):
+	matrix = random_matrix((20, 13))
+	inputs = np.random.default_rng(1).integers(-3, 4, (6, 20))
+
+	tiled = tiling.TiledMatrix(driver, matrix)
+
+	assert np.array_equal(tiled.vmm(inputs, sense_uc=True), inputs @ matrix)
+	assert np.array_equal(tiled.vmm(inputs[0], sense_every=None, sense_uc=True), inputs[0] @ matrix)
+	assert np.array_equal(tiled.read(sense_uc=True), matrix)
+
+def test_vmm_several_arrays(drivers):
+	matrix = random_matrix((30, 17))
+	inputs = np.random.default_rng(1).integers(-3, 4, (4, 30))
+
+	tiled = tiling.TiledMatrix(drivers, matrix)
+
+	assert np.array_equal(tiled.vmm(inputs, sense_uc=True), inputs @ matrix)
+
+def test_rewrites(driver):
+	matrix = np.zeros((24, 16), dtype=int)
+	matrix[:8, :8] = random_matrix((8, 8), seed=2)
+	matrix[8:16, 8:] = matrix[:8, :8] # Same tile reused
+	matrix[16:, :8] = random_matrix((8, 8), seed=3)
+	inputs = np.ones((2, 24), dtype=int)
+
+	tiled = tiling.TiledMatrix(driver, matrix)
+	assert len(tiled.groups) == 3 # 2 distinct non-zero tiles + the zero ones
+
+	tiled.vmm(inputs, sense_uc=True)
+	assert tiled.rewrites == 2 # The zero tiles are skipped
+
+	tiled.vmm(inputs, sense_uc=True)
+	assert tiled.rewrites == 2 + 1 # The tile left resident is not rewritten
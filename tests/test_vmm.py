@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from d3 import Design3Driver
+
+WEIGHTS = [[((row * 3 + col) % 3) - 1 for col in range(8)] for row in range(8)]
+
+def test_vmm_matches_reference(driver):
+	inputs = np.arange(-20, 20).reshape(5, 8)
+
+	outputs = driver.vmm(inputs, WEIGHTS, sense_uc=True)
+
+	assert np.array_equal(outputs, Design3Driver.vmm_reference(WEIGHTS, inputs))
+	assert np.array_equal(driver.vmm(inputs[0], sense_uc=True), outputs[0])
+
+def test_vmm_readouts(driver, count_senses):
+	driver.program_weights(WEIGHTS)
+	inputs = np.ones((10, 8), dtype=int)
+
+	driver.vmm(inputs, sense_uc=True)
+	assert count_senses[0] == 10 # Once per vector by default
+
+	driver.vmm(inputs, sense_every=3, sense_uc=True)
+	assert count_senses[0] == 10 + 4
+
+	driver.vmm(inputs, sense_every=None, sense_uc=True)
+	assert count_senses[0] == 10 + 4 + 1
+
+	with pytest.raises(ValueError):
+		driver.vmm(inputs, sense_every=0, sense_uc=True)
+
+def test_program_weights_resident(driver):
+	assert driver.program_weights(WEIGHTS)
+	writes = driver._mcd.write_count
+
+	assert not driver.program_weights(WEIGHTS)
+	driver.vmm(np.ones(8, dtype=int), WEIGHTS, sense_uc=True)
+	assert driver._mcd.write_count == writes
+
+	driver._mcd.set(*[0b01] * 64) # Written behind the driver's back
+	assert not driver.is_resident(WEIGHTS)
+	assert driver.program_weights(WEIGHTS)